@@ -2,43 +2,188 @@
 # ---------------------------------------------------------------------------
 # Delete assets on GEE
 # Author: Timm Nawrocki
-# Last Updated: 2024-09-22
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an Anaconda Python 3.12+ installation.
 # Description: "Delete assets on GEE" deletes a set of assets within a folder or image collection.
 # ---------------------------------------------------------------------------
 
 # Import packages
 import ee
+import random
+import re
+import requests
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Specify cloud project
 ee_project = 'akveg-map'
 
-# Authenticate with Earth Engine
+# Define batch request parameters (100 sub-requests is the maximum per batch)
+batch_url = 'https://earthengine.googleapis.com/batch'
+batch_size = 100
+
+# Define number of threads for individual delete requests
+max_workers = 16
+
+# Authenticate with Earth Engine using stored Earth Engine credentials or application default credentials
 print('Requesting information from server...')
-ee.Authenticate()
-ee.Initialize(project=ee_project)
+try:
+    credentials = ee.data.get_persistent_credentials()
+except ee.EEException:
+    # Only start the browser authentication flow in an interactive session
+    if sys.stdin.isatty() == 0:
+        raise
+    ee.Authenticate()
+    credentials = ee.data.get_persistent_credentials()
+ee.Initialize(credentials=credentials, project=ee_project)
+# Disable the client's built-in retries so that retry_with_backoff is the only retry layer for ee.data calls
+ee.data.setMaxRetries(0)
 
 # Specify the cloud project you want associated with Earth Engine requests.
 session = AuthorizedSession(
-  ee.data.get_persistent_credentials().with_quota_project(ee_project)
+  credentials.with_quota_project(ee_project)
 )
 
-# Get list of assets
-asset_list_path = {'id': 'projects/akveg-map/assets/s2_sr_2019_2023_median_midsummer_v20240724'}
-asset_list = ee.data.getList(asset_list_path)
+# Reuse pooled connections for all requests in the session and retry throttled idempotent requests
+# POST requests are not retried automatically; failed batch deletes fall back to individual deletes
+session.mount('https://', HTTPAdapter(pool_connections=32,
+                                      pool_maxsize=32,
+                                      max_retries=Retry(total=5,
+                                                        backoff_factor=0.5,
+                                                        status_forcelist=[429, 500, 502, 503, 504])))
+
+# Define function to retry a request with truncated exponential backoff and full jitter
+def retry_with_backoff(function, *args, attempts=5, base=0.5, cap=30.0):
+    """Call a function and retry it when the server reports throttling or errors.
+
+    Retries are only made for rate-limit and server error status codes and for
+    dropped or timed out connections. The delay before each retry is drawn
+    uniformly between zero and the exponential backoff ceiling.
+    """
+    for attempt in range(attempts):
+        try:
+            return function(*args)
+        except Exception as e:
+            # Read the HTTP status from the error or from the HttpError that ee.data translated into it
+            http_error = e if hasattr(e, 'resp') else e.__context__
+            status = getattr(getattr(http_error, 'resp', None), 'status', None)
+            if status is not None:
+                retryable = int(status) in [429, 500, 502, 503, 504]
+            else:
+                retryable = isinstance(e, (ConnectionError, TimeoutError,
+                                           requests.exceptions.ConnectionError,
+                                           requests.exceptions.Timeout))
+            if retryable == 0 or attempt == attempts - 1:
+                raise
+            time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+# Define function to raise the connection pool size of the Earth Engine client
+def patch_ee_pool(pool_size):
+    """Mount a larger connection pool on the requests session used by ee.data.
+
+    The Earth Engine client shares one requests session with the default pool of
+    ten connections, which discards connections when more threads make calls.
+    """
+    ee_session = ee.data._get_state().requests_session
+    ee_session.mount('https://', HTTPAdapter(pool_connections=pool_size,
+                                             pool_maxsize=pool_size))
+
+# Define generator to return pages of GEE assets from a folder or collection
+def iter_asset_pages(parent, page_size=1000):
+    params = {'parent': parent, 'pageSize': page_size, 'view': 'BASIC'}
+    while True:
+        response = retry_with_backoff(ee.data.listAssets, params)
+        yield response.get('assets', [])
+        if not response.get('nextPageToken'):
+            break
+        params['pageToken'] = response['nextPageToken']
+
+# Define function to delete a chunk of assets in a single batch request
+def batch_delete(session, asset_chunk):
+    """Delete a chunk of assets with one multipart batch request.
+
+    Each asset is sent as a DELETE sub-request. Returns a list of asset paths that
+    were not confirmed as deleted; if the batch endpoint does not return a multipart
+    response, all assets in the chunk are returned so that they can be deleted
+    individually.
+    """
+    boundary = f'batch_{uuid.uuid4().hex}'
+    parts = []
+    for index, asset_path in enumerate(asset_chunk):
+        parts.append(f'--{boundary}\r\n'
+                     f'Content-Type: application/http\r\n'
+                     f'Content-ID: <item{index}>\r\n'
+                     f'\r\n'
+                     f'DELETE /v1/{asset_path} HTTP/1.1\r\n'
+                     f'\r\n')
+    body = ''.join(parts) + f'--{boundary}--\r\n'
+    try:
+        response = session.post(batch_url,
+                                headers={'Content-Type': f'multipart/mixed; boundary={boundary}'},
+                                data=body)
+    except Exception as e:
+        print('Batch request failed:', e)
+        return list(asset_chunk)
+    # Parse the multipart response
+    match = re.search(r'boundary=(.+)', response.headers.get('Content-Type', ''))
+    if response.status_code != 200 or match is None:
+        return list(asset_chunk)
+    response_boundary = match.group(1).strip('"')
+    failed = []
+    for part in response.text.split(f'--{response_boundary}'):
+        index_match = re.search(r'Content-ID:\s*<response-item(\d+)>', part)
+        status_match = re.search(r'HTTP/1\.1 (\d{3})', part)
+        if index_match is None or status_match is None:
+            continue
+        if int(status_match.group(1)) >= 300:
+            failed.append(asset_chunk[int(index_match.group(1))])
+    # Treat any sub-request missing from the response as failed
+    returned = set(re.findall(r'Content-ID:\s*<response-item(\d+)>', response.text))
+    for index, asset_path in enumerate(asset_chunk):
+        if str(index) not in returned:
+            failed.append(asset_path)
+    return failed
+
+# Size the Earth Engine connection pool for the threaded delete requests
+patch_ee_pool(2 * max_workers)
+
+# Get list of assets using the maximum page size
+asset_list_path = 'projects/akveg-map/assets/s2_sr_2019_2023_median_midsummer_v20240724'
+asset_list = []
+for page in iter_asset_pages(asset_list_path):
+    asset_list.extend(page)
 
 # Print asset list
 print("Asset list:")
 for asset in asset_list:
-    print(asset['id'])
+    print(asset['name'])
 
-# Delete assets
-for asset in asset_list:
-    asset_path = asset['id']
-    try:
-        ee.data.deleteAsset(asset_path)
-        print("Asset deleted:", asset_path)
-    except Exception as e:
-        print("Failed to delete asset:", asset_path)
-        print("Error:", e)
+# Delete assets in batches
+asset_paths = [asset['name'] for asset in asset_list]
+failed_list = []
+for i in range(0, len(asset_paths), batch_size):
+    asset_chunk = asset_paths[i:i + batch_size]
+    failed_chunk = batch_delete(session, asset_chunk)
+    for asset_path in asset_chunk:
+        if asset_path not in failed_chunk:
+            print("Asset deleted:", asset_path)
+    failed_list.extend(failed_chunk)
+
+# Delete any assets that were not deleted in a batch individually in parallel threads
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = {executor.submit(retry_with_backoff, ee.data.deleteAsset, asset_path): asset_path
+               for asset_path in failed_list}
+    for future in as_completed(futures):
+        asset_path = futures[future]
+        try:
+            future.result()
+            print("Asset deleted:", asset_path)
+        except Exception as e:
+            print("Failed to delete asset:", asset_path)
+            print("Error:", e)
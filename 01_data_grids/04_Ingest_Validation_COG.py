@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Ingest covariate data
 # Author: Timm Nawrocki
-# Last Updated: 2024-07-11
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.9+ installation.
 # Description: "Ingest covariate data" creates COG-backed assets for a folder of geotiffs in GEE.
 # ---------------------------------------------------------------------------
@@ -11,9 +11,13 @@
 import ee
 import json
 import os
-import re
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
 from pprint import pprint
 
 # Define paths
@@ -21,6 +25,12 @@ ee_project = 'akveg-map'
 storage_bucket = 'akveg-data'
 storage_prefix = 'validation_v20240729'
 
+# Define the request url
+url = 'https://earthengine.googleapis.com/v1alpha/projects/{}/assets?assetId={}'
+
+# Define number of threads for ingestion requests
+max_workers = 16
+
 # Authenticate with Earth Engine
 print('Requesting information from server...')
 ee.Authenticate()
@@ -31,54 +41,83 @@ session = AuthorizedSession(
   ee.data.get_persistent_credentials().with_quota_project(ee_project)
 )
 
-# Request list of storage objects
-client = storage.Client()
-file_list = []
-for blob in client.list_blobs(storage_bucket, prefix=storage_prefix):
-  file_list.append(blob.name)
+# Share pooled connections across threads
+# Throttled create requests are retried in post_with_backoff because urllib3 does not retry POST requests
+session.mount('https://', HTTPAdapter(pool_connections=max_workers,
+                                      pool_maxsize=max_workers))
 
-# Filter the list to geotiffs in the
-reg = re.compile(r'^' + storage_prefix + r'/.*.tif$')
-geotiff_list = list(filter(reg.search, file_list))
+# Get set of GEE assets for constant-time membership checks
+asset_set = set()
+for asset in ee.data.listAssets({'parent': f'projects/{ee_project}/assets/{storage_prefix}',
+                                 'view': 'BASIC'})['assets']:
+  asset_set.add(os.path.split(asset['name'])[1] + '.tif')
 
-# Get list of GEE assets
-asset_list = []
-for asset in ee.data.listAssets(f'projects/{ee_project}/assets/{storage_prefix}')['assets']:
-  asset_list.append(os.path.split(asset['name'])[1] + '.tif')
+# Define function to post a request and retry it when the server reports throttling
+def post_with_backoff(request_url, request_data, attempts=5, base=0.5, cap=30.0):
+  """Post a request and retry it with truncated exponential backoff and full jitter.
 
-# Ingest each geotiff in the storage folder
-for geotiff in geotiff_list:
-  # Define file name
-  file_name = os.path.split(geotiff)[1]
-  # Ingest asset if it does not already exist
-  if file_name not in asset_list:
-      print(f'Ingesting {file_name} as a COG-backed asset...')
+  Retries are only made for 429 responses and for 503 responses with a Retry-After
+  header, which the server returns without processing the request, so a repeated
+  create cannot be duplicated. A Retry-After delay in seconds is used when given.
+  """
+  for attempt in range(attempts):
+    response = session.post(url=request_url, data=request_data)
+    retry_after = response.headers.get('Retry-After')
+    throttled = response.status_code == 429 or (response.status_code == 503 and retry_after is not None)
+    if throttled == 0 or attempt == attempts - 1:
+      return response
+    if retry_after is not None and retry_after.isdigit():
+      time.sleep(min(cap, float(retry_after)))
+    else:
+      time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
 
-      # Request body as a dictionary.
-      request = {
-        'type': 'IMAGE',
-        'gcs_location': {
-          'uris': [f'gs://{storage_bucket}/{storage_prefix}/{file_name}']
-        },
-        'properties': {
-          'source': 'https://github.com/accs-uaa/akveg-map'
-        },
-        'startTime': '2024-01-01T00:00:00.000000000Z',
-        'endTime': '2024-12-31T15:01:23.000000000Z',
-      }
-      pprint(json.dumps(request))
+# Define function to ingest a single geotiff as a COG-backed asset
+def ingest(file_name):
+  # Request body as a dictionary.
+  request = {
+    'type': 'IMAGE',
+    'gcs_location': {
+      'uris': [f'gs://{storage_bucket}/{storage_prefix}/{file_name}']
+    },
+    'properties': {
+      'source': 'https://github.com/accs-uaa/akveg-map'
+    },
+    'startTime': '2024-01-01T00:00:00.000000000Z',
+    'endTime': '2024-12-31T15:01:23.000000000Z',
+  }
 
-      # Specify a folder (or ImageCollection) name and the new asset name.
-      asset_id = f'{storage_prefix}/{os.path.splitext(file_name)[0]}'
+  # Specify a folder (or ImageCollection) name and the new asset name.
+  asset_id = f'{storage_prefix}/{os.path.splitext(file_name)[0]}'
 
-      # Define the request url
-      url = 'https://earthengine.googleapis.com/v1alpha/projects/{}/assets?assetId={}'
+  # Post the request
+  response = post_with_backoff(url.format(ee_project, asset_id), json.dumps(request))
+  # Raise an error for unsuccessful requests so that they are reported as failures
+  response.raise_for_status()
+  return json.loads(response.content)
 
-      # Post the request
-      response = session.post(
-        url=url.format(ee_project, asset_id),
-        data=json.dumps(request)
-      )
-      pprint(json.loads(response.content))
-  else:
-    print(f'{file_name} has already been ingested as a COG-backed asset.')
+# Stream the storage listing into parallel ingestion threads
+# Ingestion requests start while later pages of the listing are still being returned
+client = storage.Client()
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+  futures = {}
+  # Restrict the listing to files directly within the storage prefix folder so that sibling prefixes are excluded
+  for blob in client.list_blobs(storage_bucket, prefix=f'{storage_prefix}/', delimiter='/'):
+    # Filter the listing to geotiffs
+    if blob.name.endswith('.tif') == 0:
+      continue
+    # Define file name
+    file_name = os.path.split(blob.name)[1]
+    # Ingest asset if it does not already exist
+    if file_name not in asset_set:
+      futures[executor.submit(ingest, file_name)] = file_name
+    else:
+      print(f'{file_name} has already been ingested as a COG-backed asset.')
+  print(f'Submitted {len(futures)} geotiffs for ingestion as COG-backed assets.')
+  for future in as_completed(futures):
+    file_name = futures[future]
+    try:
+      result = future.result()
+      print(f'Ingested {file_name} as a COG-backed asset.')
+      pprint(result)
+    except Exception as e:
+      print(f'Failed to ingest {file_name}:', e)
@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Create modeling grids
 # Author: Timm Nawrocki
-# Last Updated: 2024-09-18
+# Last Updated: 2026-10-17
 # Usage: Must be executed in a Python 3.12+ installation.
 # Description: "Create modeling grids" creates individual raster versions of the 50 x 50 km grids for use as modeling domains in prediction.
 # ---------------------------------------------------------------------------
@@ -10,87 +10,129 @@
 # Import packages
 import os
 import geopandas as gpd
-import rasterio
-from rasterio import features
+from concurrent.futures import ProcessPoolExecutor
+from osgeo import gdal
+from osgeo import ogr
+from osgeo import osr
+from shapely.geometry import box
 import time
 from akutils import *
 
-# Set root directory
-drive = 'D:/'
-root_folder = 'ACCS_Work/Projects/VegetationEcology/AKVEG_Map/Data'
+# Configure GDAL
+gdal.UseExceptions()
 
-# Define folder structure
-source_geodatabase = os.path.join(drive, root_folder, 'AKVEG_Regions.gdb')
-output_folder = os.path.join(drive, root_folder, 'Data_Input/grid_050')
+# Define function to convert a single grid to raster
+def rasterize_one(grid_code, bounds, geom_wkb, is_rectangle, crs_wkt, output_folder, pixel_size, nodata):
+    """Rasterize a single grid geometry to a geotiff in the output folder.
 
-# Define input files
-grid_input = 'AlaskaYukon_050_Tiles_3338'
-
-# Read grid feature class
-grid_feature = gpd.read_file(source_geodatabase, layer=grid_input)
-grid_feature['out_value'] = 1
-
-# Define pixel_size and NoData value of new raster
-pixel_size = 10
-nodata = 255
-
-# Export a raster for each grid
-count = 1
-for grid_code in grid_feature['grid_code']:
+    Arguments are plain values so that the function can be sent to worker processes.
+    Grids that are axis-aligned rectangles spanning whole pixels are filled with the
+    burn value directly instead of being rasterized.
+    """
     # Define output file
     grid_output = os.path.join(output_folder, f'{grid_code}_10m_3338.tif')
 
-    # Convert grid if grid raster does not already exist
-    if os.path.exists(grid_output) == 0:
-        print(f'Converting grid {count} out of {len(grid_feature)}...')
-        iteration_start = time.time()
-
-        # Parse target feature and geometry
-        target_feature = grid_feature.query(f'grid_code=="{grid_code}"')
-        geometry = [shapes for shapes in target_feature.geometry]
+    # Define output creation options with single-threaded compression because grids are processed in parallel
+    creation_options = ['TILED=YES',
+                        'BLOCKXSIZE=256',
+                        'BLOCKYSIZE=256',
+                        'COMPRESS=DEFLATE',
+                        'PREDICTOR=2',
+                        'ZLEVEL=6',
+                        'NUM_THREADS=1']
 
-        # Prepare raster shape variables
-        xmin, ymin, xmax, ymax = target_feature.total_bounds
+    # Fill rectangular grids without rasterizing
+    if is_rectangle == 1:
+        xmin, ymin, xmax, ymax = bounds
         width = int((xmax - xmin) // pixel_size)
         height = int((ymax - ymin) // pixel_size)
-        transform = rasterio.transform.from_origin(xmin, ymax, pixel_size, pixel_size)
-
-        # Define shapes
-        shapes = ((geom, value) for geom, value in zip(target_feature.geometry, target_feature.out_value))
-
-        # Create raster in memory
-        burned = features.rasterize(
-            shapes=shapes,
-            out_shape=(width, height),
-            transform=transform,
-            all_touched=True,
-            dtype='uint8'
-        )
-
-        # Write raster to destination
-        with rasterio.open(
-            grid_output,
-            mode='w',
-            driver='GTiff',
-            dtype='uint8',
-            height=height,
-            width=width,
-            count=1,
-            crs=target_feature.crs,
-            transform=transform,
-            compress='lzw',
-            nodata=nodata,
-            tiled=True,
-            blockxsize=256,
-            blockysize=256
-        ) as dst:
-            dst.write_band(1, burned)
-        end_timing(iteration_start)
-
-    else:
-        # If grid raster already exists, continue to next grid
-        print(f'Grid {count} of {len(grid_feature)} already exists.')
-        print('----------')
-
-    # Increase count
-    count += 1
+        grid_dataset = gdal.GetDriverByName('GTiff').Create(grid_output, width, height, 1, gdal.GDT_Byte,
+                                                            options=creation_options)
+        grid_dataset.SetGeoTransform((xmin, pixel_size, 0, ymax, 0, -pixel_size))
+        grid_dataset.SetProjection(crs_wkt)
+        grid_band = grid_dataset.GetRasterBand(1)
+        grid_band.SetNoDataValue(nodata)
+        grid_band.Fill(1)
+        grid_dataset = None
+        return grid_code
+
+    # Load geometry into an in-memory vector dataset
+    spatial_reference = osr.SpatialReference()
+    spatial_reference.ImportFromWkt(crs_wkt)
+    vector_dataset = gdal.GetDriverByName('Memory').Create('', 0, 0, 0, gdal.GDT_Unknown)
+    vector_layer = vector_dataset.CreateLayer('grid', srs=spatial_reference, geom_type=ogr.wkbPolygon)
+    vector_feature = ogr.Feature(vector_layer.GetLayerDefn())
+    vector_feature.SetGeometry(ogr.CreateGeometryFromWkb(geom_wkb))
+    vector_layer.CreateFeature(vector_feature)
+
+    # Burn geometry directly into the output raster
+    gdal.Rasterize(grid_output,
+                   vector_dataset,
+                   format='GTiff',
+                   outputType=gdal.GDT_Byte,
+                   outputSRS=spatial_reference,
+                   outputBounds=bounds,
+                   xRes=pixel_size,
+                   yRes=pixel_size,
+                   initValues=[0],
+                   burnValues=[1],
+                   noData=nodata,
+                   allTouched=True,
+                   creationOptions=creation_options)
+    return grid_code
+
+if __name__ == '__main__':
+    # Set root directory
+    drive = 'D:/'
+    root_folder = 'ACCS_Work/Projects/VegetationEcology/AKVEG_Map/Data'
+
+    # Define folder structure
+    source_geodatabase = os.path.join(drive, root_folder, 'AKVEG_Regions.gdb')
+    output_folder = os.path.join(drive, root_folder, 'Data_Input/grid_050')
+
+    # Define input files
+    grid_input = 'AlaskaYukon_050_Tiles_3338'
+
+    # Read grid feature class
+    grid_feature = gpd.read_file(source_geodatabase, layer=grid_input)
+    crs_wkt = grid_feature.crs.to_wkt()
+
+    # Define pixel_size and NoData value of new raster
+    pixel_size = 10
+    nodata = 255
+
+    # List existing grid rasters once
+    existing_files = set(os.listdir(output_folder))
+
+    # Identify grids that do not already have a raster
+    task_list = []
+    grid_length = len(grid_feature)
+    count = 1
+    for grid_code, geometry in zip(grid_feature['grid_code'], grid_feature.geometry):
+        if f'{grid_code}_10m_3338.tif' not in existing_files:
+            # Flag grids that are axis-aligned rectangles spanning whole pixels
+            xmin, ymin, xmax, ymax = geometry.bounds
+            is_rectangle = int(geometry.equals(box(xmin, ymin, xmax, ymax))
+                               and (xmax - xmin) % pixel_size == 0
+                               and (ymax - ymin) % pixel_size == 0)
+            task_list.append((grid_code, geometry.bounds, geometry.wkb, is_rectangle))
+        else:
+            # If grid raster already exists, continue to next grid
+            print(f'Grid {count} of {grid_length} already exists.')
+            print('----------')
+        count += 1
+
+    # Export a raster for each grid in parallel processes
+    print(f'Converting {len(task_list)} grids...')
+    iteration_start = time.time()
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(rasterize_one, grid_code, bounds, geom_wkb, is_rectangle, crs_wkt,
+                                   output_folder, pixel_size, nodata)
+                   for grid_code, bounds, geom_wkb, is_rectangle in task_list]
+        task_length = len(task_list)
+        count = 1
+        for future in futures:
+            grid_code = future.result()
+            print(f'\tConverted grid {grid_code} ({count} of {task_length}).')
+            count += 1
+    end_timing(iteration_start)
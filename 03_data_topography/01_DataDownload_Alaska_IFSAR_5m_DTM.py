@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Download Alaska IFSAR 5m DTM tiles
 # Author: Timm Nawrocki
-# Last Updated: 2023-11-03
+# Last Updated: 2026-10-17
 # Usage: Execute in Python 3.9+.
 # Description: "Download Alaska IFSAR 5m DTM tiles" contacts the DGGS FTP server to download all 5 m IFSAR DTM tiles for Alaska.
 # ---------------------------------------------------------------------------
@@ -11,9 +11,12 @@
 import os
 import shutil
 import time
-from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from akutils import end_timing
 
 # Define base folder structure
@@ -34,8 +37,19 @@ if os.path.exists(download_folder) == 0:
 if os.path.exists(extract_folder) == 0:
     os.mkdir(extract_folder)
 
+# Define number of parallel downloads
+max_workers = 16
+
+# Share pooled connections across download threads and retry failed requests
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=max_workers,
+                                      pool_maxsize=max_workers,
+                                      max_retries=Retry(total=5,
+                                                        backoff_factor=0.5,
+                                                        status_forcelist=[502, 503, 504])))
+
 # Get all links from source url
-source_requests = requests.get(base_url)
+source_requests = session.get(base_url)
 source_format = BeautifulSoup(source_requests.text, features='lxml')
 file_list = []
 for link in source_format.find_all('a'):
@@ -44,36 +58,58 @@ file_list.remove('../')
 file_list.remove('_md5_checksums.txt')
 file_list.remove('_sha1_checksums.txt')
 
-# Loop through urls in the downloadURL column and download
-count = 1
-for download in file_list:
-    url = base_url + '/' + download
+# Define function to download and extract a single archive
+def download_one(download):
+    """Download and extract a single archive.
+
+    Returns the file name, a status of 'downloaded' or 'failed', and the error for
+    failed downloads.
+    """
+    # Create download file path
     download_file = os.path.join(download_folder, download)
-    # Download file if it does not already exist on local disk
-    if os.path.exists(download_file) == 0:
-        try:
-            print(f'Downloading file {count} of {len(download_list)}...')
-            iteration_start = time.time()
-            response = requests.get(base_url + download, stream=True)
-            total_size = int(response.headers.get('content-length', 0))
-            block_size = 8192
-            progress_bar = tqdm(total=total_size, unit='iB', unit_scale=True)
-            with open(download_file, 'wb') as file:
-                for data in response.iter_content(block_size):
-                    progress_bar.update(len(data))
+    partial_file = download_file + '.part'
+    # Download to a partial file and rename on success so that interrupted downloads are repeated
+    try:
+        with session.get(base_url + download, stream=True) as response:
+            response.raise_for_status()
+            with open(partial_file, 'wb') as file:
+                for data in response.iter_content(1024 * 1024):
                     file.write(data)
-            progress_bar.close()
-            # Extract contents from archive
-            try:
-                print('Unzipping archive...')
-                shutil.unpack_archive(download_file, extract_folder, 'tar')
-            except:
-                print(f'{os.path.split(download_file)[1]} is not an archive.')
-            end_timing(iteration_start)
-        except:
-            print(f'File {count} of {len(download_list)} not available for download. Check url.')
-            print('----------')
+        os.replace(partial_file, download_file)
+    except Exception as e:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        return download, 'failed', e
+    # Extract contents from archive
+    try:
+        shutil.unpack_archive(download_file, extract_folder, 'tar')
+    except:
+        print(f'{download} is not an archive.')
+    return download, 'downloaded', None
+
+# Identify files that have not already been downloaded
+download_list = []
+count = 1
+for download in file_list:
+    # Add file to download list if it does not already exist on local disk
+    if os.path.exists(os.path.join(download_folder, download)) == 0:
+        download_list.append(download)
     else:
-        print(f'\tFile {count} of {len(download_list)} already exists...')
+        print(f'\tFile {count} of {len(file_list)} already exists...')
         print('\t----------')
-    count += 1
\ No newline at end of file
+    count += 1
+
+# Download and extract each file in parallel threads
+print(f'Downloading {len(download_list)} files...')
+iteration_start = time.time()
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = [executor.submit(download_one, download) for download in download_list]
+    count = 1
+    for future in as_completed(futures):
+        download, status, error = future.result()
+        if status == 'downloaded':
+            print(f'\tDownloaded {download} ({count} of {len(download_list)}).')
+        else:
+            print(f'\tFile {download} failed to download:', error)
+        count += 1
+end_timing(iteration_start)
@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Download ESA GLO DEM 30 m tiles
 # Author: Timm Nawrocki
-# Last Updated: 2024-04-03
+# Last Updated: 2026-10-17
 # Usage: Execute in Python 3.9+.
 # Description: "Download ESA GLO DEM 30 m tiles" contacts a server to download a series of 30 m DEM tiles for the ESA GLO 30 m DEM: https://spacedata.copernicus.eu/en/web/guest/collections/copernicus-digital-elevation-model
 # ---------------------------------------------------------------------------
@@ -11,10 +11,14 @@
 import glob
 import os
 import shutil
+import tarfile
 import time
-from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from akutils import end_timing
 
 # Define base folder structure
@@ -37,41 +41,113 @@ input_table = os.path.join(data_folder, 'ESA_GLO_30m_Index.csv')
 block_field = 'Product30'
 base_url = 'https://prism-dem-open.copernicus.eu/pd-desk-open-access/prismDownload/COP-DEM_GLO-30-DGED__2022_1/'
 
+# Define number of parallel downloads
+max_workers = 16
+
+# Define whether to keep downloaded archives (otherwise archives are extracted as they download)
+keep_archive = False
+
 # Import a csv file with the download urls for the Arctic DEM tiles
 download_items = pd.read_csv(input_table)
 
-# Download each zip file if it has not already been downloaded
+# Share pooled connections across download threads and retry failed requests
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=max_workers,
+                                      pool_maxsize=max_workers,
+                                      max_retries=Retry(total=5,
+                                                        backoff_factor=0.5,
+                                                        status_forcelist=[502, 503, 504])))
+
+# Define function to download and extract a single archive
+def download_one(download):
+    """Download and extract a single archive.
+
+    Returns the archive name, a status of 'downloaded' or 'failed', and the error
+    for failed downloads.
+    """
+    # Create download file path
+    download_file = os.path.join(download_folder, download)
+    partial_file = download_file + '.part'
+    # Stream the archive directly into the extract folder without writing it to disk
+    if keep_archive == 0:
+        tile_name = os.path.splitext(download)[0]
+        staging_folder = os.path.join(download_folder, tile_name + '.part')
+        # Extract to the staging folder and move the tile folder on success so that interrupted downloads are repeated
+        try:
+            # Clear any staging folder left by an interrupted run
+            shutil.rmtree(staging_folder, ignore_errors=True)
+            os.mkdir(staging_folder)
+            with session.get(base_url + download, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with tarfile.open(fileobj=response.raw, mode='r|*') as archive:
+                    # Reject unsafe members from the remote archive where the data filter is supported
+                    if hasattr(tarfile, 'data_filter'):
+                        archive.extractall(staging_folder, filter='data')
+                    else:
+                        archive.extractall(staging_folder)
+            # Move the top-level folder of the archive to the tile folder name used to identify existing tiles
+            member_list = os.listdir(staging_folder)
+            if len(member_list) != 1 or os.path.isdir(os.path.join(staging_folder, member_list[0])) == 0:
+                raise ValueError(f'archive does not contain a single top-level folder: {member_list}')
+            os.replace(os.path.join(staging_folder, member_list[0]), os.path.join(extract_folder, tile_name))
+            shutil.rmtree(staging_folder)
+        except Exception as e:
+            shutil.rmtree(staging_folder, ignore_errors=True)
+            return download, 'failed', e
+        return download, 'downloaded', None
+    # Download to a partial file and rename on success so that interrupted downloads are repeated
+    try:
+        with session.get(base_url + download, stream=True) as response:
+            response.raise_for_status()
+            with open(partial_file, 'wb') as file:
+                for data in response.iter_content(1024 * 1024):
+                    file.write(data)
+        os.replace(partial_file, download_file)
+    except Exception as e:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        return download, 'failed', e
+    # Extract contents from archive
+    try:
+        shutil.unpack_archive(download_file, extract_folder, 'tar')
+    except:
+        print(f'{download} is not an archive.')
+    return download, 'downloaded', None
+
+# Identify zip files that have not already been downloaded
+download_list = []
+file_length = len(download_items[block_field])
 count = 1
 for download in download_items[block_field]:
     # Update file name
     download = download.replace('DSM_30', 'DSM_10') + '.tar'
-    # Create download file path
-    download_file = os.path.join(download_folder, download)
-    # Download file if it does not exist
-    if os.path.exists(download_file) == 0:
-        print(f'Downloading file {count} of {len(download_items[block_field])}...')
-        iteration_start = time.time()
-        response = requests.get(base_url + download, stream=True)
-        total_size = int(response.headers.get('content-length', 0))
-        block_size = 8192
-        progress_bar = tqdm(total=total_size, unit='iB', unit_scale=True)
-        with open(download_file, 'wb') as file:
-            for data in response.iter_content(block_size):
-                progress_bar.update(len(data))
-                file.write(data)
-        progress_bar.close()
-        # Extract contents from archive
-        try:
-            print('Unzipping archive...')
-            shutil.unpack_archive(download_file, extract_folder, 'tar')
-        except:
-            print(f'{os.path.split(download_file)[1]} is not an archive.')
-        end_timing(iteration_start)
+    # Add file to download list if neither the archive nor its extracted tile folder exist
+    tile_folder = os.path.join(extract_folder, os.path.splitext(download)[0])
+    if (os.path.exists(os.path.join(download_folder, download)) == 0
+            and os.path.exists(tile_folder) == 0):
+        download_list.append(download)
     else:
-        print(f'File {count} of {len(download_items[block_field])} already exists.')
+        print(f'File {count} of {file_length} already exists.')
         print('----------')
     count += 1
 
+# Download and extract each zip file in parallel threads
+print(f'Downloading {len(download_list)} files...')
+iteration_start = time.time()
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = [executor.submit(download_one, download) for download in download_list]
+    count = 1
+    for future in as_completed(futures):
+        download, status, error = future.result()
+        if status == 'downloaded':
+            print(f'\tDownloaded {download} ({count} of {len(download_list)}).')
+        else:
+            print(f'\tFile {download} failed to download:', error)
+        count += 1
+end_timing(iteration_start)
+print('----------')
+
 # Copy files to main directory
 for folder in next(os.walk(extract_folder))[1]:
     if folder != 'corrected':
@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Process Alaska IFSAR DTM 5 m tiles
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-17
 # Usage: Execute in Python 3.9+.
 # Description: "Process Alaska IFSAR DTM 5 m tiles" combines individual DEM tiles to a single raster, resamples to 10 m, and replaces erroneous values.
 # ---------------------------------------------------------------------------
@@ -64,26 +64,40 @@ for elevation_input in input_files:
     tile_list.append(corrected_output)
     # Prepare raster file
     if os.path.exists(corrected_output) == 0:
-        elevation_raster = rasterio.open(elevation_input)
+        elevation_raster = rasterio.open(elevation_input, sharing=False)
         raster_profile = elevation_raster.profile.copy()
-        with rasterio.open(corrected_output, 'w', **raster_profile) as dst:
-            # Find number of raster blocks
-            window_list = []
-            for block_index, window in elevation_raster.block_windows(1):
-                window_list.append(window)
+        with rasterio.open(corrected_output, 'w', sharing=False, **raster_profile) as dst:
+            # Find raster blocks in a single pass
+            window_list = [window for block_index, window in elevation_raster.block_windows(1)]
+            # Preallocate block and mask buffers once per tile
+            block_height, block_width = elevation_raster.block_shapes[0]
+            buffer_size = elevation_raster.count * block_height * block_width
+            block_buffer = np.empty(buffer_size, dtype=elevation_raster.dtypes[0])
+            low_buffer = np.empty(buffer_size, dtype=bool)
+            high_buffer = np.empty(buffer_size, dtype=bool)
             # Iterate processing through raster blocks
             count = 1
             progress = 0
-            for block_index, window in elevation_raster.block_windows(1):
-                raster_block = elevation_raster.read(window=window,
-                                                     masked=True)
+            for window in window_list:
+                # Use contiguous views of the buffers so that smaller edge blocks do not allocate
+                block_shape = (elevation_raster.count, window.height, window.width)
+                block_length = block_shape[0] * block_shape[1] * block_shape[2]
+                raster_block = block_buffer[:block_length].reshape(block_shape)
+                low_mask = low_buffer[:block_length].reshape(block_shape)
+                high_mask = high_buffer[:block_length].reshape(block_shape)
+                elevation_raster.read(out=raster_block,
+                                      window=window)
                 # Replace erroneous values
-                raster_block = np.where((raster_block < -20) | (raster_block > 6195), nodata, raster_block)
+                np.less(raster_block, -20, out=low_mask)
+                np.greater(raster_block, 6195, out=high_mask)
+                np.logical_or(low_mask, high_mask, out=low_mask)
+                np.putmask(raster_block, low_mask, nodata)
                 # Write results
                 dst.write(raster_block,
                           window=window)
                 # Report progress
                 count, progress = raster_block_progress(4, len(window_list), count, progress)
+        elevation_raster.close()
     tile_count += 1
     end_timing(iteration_start)
 
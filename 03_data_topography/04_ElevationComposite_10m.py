@@ -2,16 +2,20 @@
 # ---------------------------------------------------------------------------
 # Create elevation composite
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-17
 # Usage: Execute in Python 3.9+.
 # Description: "Create elevation composite" combines overlapping elevation input datasets into a single raster output.
 # ---------------------------------------------------------------------------
 
 # Import packages
 import os
+import threading
 import time
 import numpy as np
 import rasterio
+from rasterio.windows import Window
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from osgeo import gdal
 from akutils import *
 
@@ -34,55 +38,92 @@ canada_input = os.path.join(topography_folder, 'ESA_GLO_30m/processed', 'ESA_GLO
 
 # Define output files
 merge_vrt = os.path.join(output_folder, 'intermediate', 'Elevation_10m_3338_Merged.vrt')
-merge_output = os.path.join(output_folder, 'intermediate', 'Elevation_10m_3338_Merged.tif')
 elevation_output = os.path.join(output_folder, 'float', 'Elevation_10m_3338.tif')
 
-# Merge input rasters
+# Merge input rasters (the virtual raster is read directly by the masking step so the merge is never written to disk)
 print(f'Merging input rasters...')
 iteration_start = time.time()
 # List input files with priority to last pixel
 input_files = [canada_input, alaska_input]
-# Build and translate virtual raster
+# Build virtual raster
 area_bounds = raster_bounds(area_input)
-gdal.BuildVRT(merge_vrt,
-              input_files,
-              outputSRS='EPSG:3338',
-              xRes=10,
-              yRes=10,
-              srcNodata=nodata,
-              VRTNodata=nodata,
-              outputBounds=area_bounds)
-gdal.Translate(merge_output,
-               merge_vrt,
-               creationOptions = ['COMPRESS=LZW', 'BIGTIFF=YES'])
+merge_dataset = gdal.BuildVRT(merge_vrt,
+                              input_files,
+                              outputSRS='EPSG:3338',
+                              xRes=10,
+                              yRes=10,
+                              srcNodata=nodata,
+                              VRTNodata=nodata,
+                              outputBounds=area_bounds)
+# Close the virtual raster to write it to disk
+merge_dataset = None
 end_timing(iteration_start)
 
+# Define thread-local storage for raster handles
+thread_data = threading.local()
+handle_list = []
+
+# Define function to mask a single raster block
+def mask_block(window):
+    # Open raster handles once per thread because rasterio datasets cannot be shared across threads
+    if hasattr(thread_data, 'elevation_raster') == 0:
+        thread_data.elevation_raster = rasterio.open(merge_vrt)
+        thread_data.area_raster = rasterio.open(area_input)
+        handle_list.extend([thread_data.elevation_raster, thread_data.area_raster])
+    area_block = thread_data.area_raster.read(window=window,
+                                              masked=False)
+    raster_block = thread_data.elevation_raster.read(window=window,
+                                                     masked=False)
+    # Set no data values in input raster to 0 and no data values from area raster to no data in place
+    np.putmask(raster_block, raster_block == nodata, 0)
+    np.putmask(raster_block, area_block != 1, nodata)
+    return window, raster_block
+
 # Update mask for output raster
 print(f'Masking output raster...')
 iteration_start = time.time()
-elevation_raster = rasterio.open(merge_output)
-raster_profile = elevation_raster.profile.copy()
-area_raster = rasterio.open(area_input)
-with rasterio.open(elevation_output, 'w', **raster_profile, BIGTIFF='YES') as dst:
-    # Find number of raster blocks
-    window_list = []
-    for block_index, window in area_raster.block_windows(1):
-        window_list.append(window)
-    # Iterate processing through raster blocks
-    count = 1
-    progress = 0
-    for block_index, window in area_raster.block_windows(1):
-        area_block = area_raster.read(window=window,
-                                      masked=False)
-        raster_block = elevation_raster.read(window=window,
-                                             masked=False)
-        # Set no data values in input raster to 0
-        raster_block = np.where(raster_block == nodata, 0, raster_block)
-        # Set no data values from area raster to no data
-        raster_block = np.where(area_block != 1, nodata, raster_block)
-        # Write results
-        dst.write(raster_block,
-                  window=window)
-        # Report progress
-        count, progress = raster_block_progress(100, len(window_list), count, progress)
+with rasterio.Env(GDAL_CACHEMAX=4096):
+    with rasterio.open(merge_vrt) as elevation_raster:
+        raster_profile = elevation_raster.profile.copy()
+    raster_profile.update(driver='GTiff',
+                          compress='lzw',
+                          predictor=3,
+                          tiled=True,
+                          blockxsize=512,
+                          blockysize=512,
+                          num_threads='ALL_CPUS')
+    with rasterio.open(elevation_output, 'w', **raster_profile, BIGTIFF='YES') as dst:
+        # Generate raster block windows in the tiled output directly from the block size
+        block_height, block_width = dst.block_shapes[0]
+        window_list = [Window(col_off, row_off,
+                              min(block_width, dst.width - col_off),
+                              min(block_height, dst.height - row_off))
+                       for row_off in range(0, dst.height, block_height)
+                       for col_off in range(0, dst.width, block_width)]
+        # Read and mask raster blocks in parallel threads and write results serially in this thread
+        # Keep at most twice the number of workers in flight so that blocks are not queued in memory
+        count = 1
+        progress = 0
+        max_workers = os.cpu_count()
+        pending_list = iter(window_list)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = set()
+            while True:
+                # Submit blocks until the in-flight limit is reached
+                for window in pending_list:
+                    futures.add(executor.submit(mask_block, window))
+                    if len(futures) >= 2 * max_workers:
+                        break
+                if len(futures) == 0:
+                    break
+                # Write the first block to complete
+                future = next(as_completed(futures))
+                futures.remove(future)
+                window, raster_block = future.result()
+                dst.write(raster_block,
+                          window=window)
+                # Report progress
+                count, progress = raster_block_progress(100, len(window_list), count, progress)
+    for handle in handle_list:
+        handle.close()
 end_timing(iteration_start)
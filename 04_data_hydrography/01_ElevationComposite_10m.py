@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Create elevation composite
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-17
 # Usage: Execute in Python 3.9+.
 # Description: "Create elevation composite" combines overlapping elevation input datasets into a single raster output.
 # ---------------------------------------------------------------------------
@@ -12,6 +12,7 @@ import os
 import time
 import numpy as np
 import rasterio
+from rasterio.windows import Window
 from osgeo import gdal
 from akutils import *
 
@@ -65,22 +66,24 @@ elevation_raster = rasterio.open(merge_output)
 raster_profile = elevation_raster.profile.copy()
 area_raster = rasterio.open(area_input)
 with rasterio.open(elevation_output, 'w', **raster_profile, BIGTIFF='YES') as dst:
-    # Find number of raster blocks
-    window_list = []
-    for block_index, window in area_raster.block_windows(1):
-        window_list.append(window)
+    # Generate raster block windows once from the area raster block size
+    block_height, block_width = area_raster.block_shapes[0]
+    window_list = [Window(col_off, row_off,
+                          min(block_width, area_raster.width - col_off),
+                          min(block_height, area_raster.height - row_off))
+                   for row_off in range(0, area_raster.height, block_height)
+                   for col_off in range(0, area_raster.width, block_width)]
     # Iterate processing through raster blocks
     count = 1
     progress = 0
-    for block_index, window in area_raster.block_windows(1):
+    for window in window_list:
         area_block = area_raster.read(window=window,
                                       masked=False)
         raster_block = elevation_raster.read(window=window,
                                              masked=False)
-        # Set no data values in input raster to 0
-        raster_block = np.where(raster_block == nodata, 0, raster_block)
-        # Set no data values from area raster to no data
-        raster_block = np.where(area_block != 1, nodata, raster_block)
+        # Set no data values in input raster to 0 and no data values from area raster to no data in place
+        np.putmask(raster_block, raster_block == nodata, 0)
+        np.putmask(raster_block, area_block != 1, nodata)
         # Write results
         dst.write(raster_block,
                   window=window)
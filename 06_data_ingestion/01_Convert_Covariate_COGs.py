@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Create cloud-optimized geotiffs for covariates
 # Author: Timm Nawrocki
-# Last Updated: 2024-07-12
+# Last Updated: 2026-10-17
 # Usage: Must be executed in a Python 3.11+ installation with GDAL 3.9+.
 # Description: "Create cloud-optimized geotiffs for covariates" creates cloud-optimized geotiff versions of all covariates for use as COG-backed assets in Google Earth Engine.
 # ---------------------------------------------------------------------------
@@ -15,6 +15,8 @@ from osgeo import gdal
 
 # Configure GDAL
 gdal.UseExceptions()
+gdal.SetConfigOption('GDAL_CACHEMAX', '4096')
+gdal.SetConfigOption('GDAL_NUM_THREADS', 'ALL_CPUS')
 
 # Set root directory
 drive = '/home'
@@ -49,9 +51,10 @@ for input_file in input_files[:]:
                        input_file,
                        format='COG',
                        creationOptions=['BLOCKSIZE=256',
-                                        'COMPRESS=DEFLATE',
-                                        'LEVEL=9',
-                                        'PREDICTOR=STANDARD',
+                                        'COMPRESS=ZSTD',
+                                        'LEVEL=13',
+                                        'PREDICTOR=YES',
+                                        'NUM_THREADS=ALL_CPUS',
                                         'BIGTIFF=YES'])
         print(f'\tFinished creating cloud-optimized raster {count} of {len(input_files)}.')
         fmt_end = time.gmtime()
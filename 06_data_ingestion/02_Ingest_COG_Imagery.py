@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Ingest covariate data
 # Author: Timm Nawrocki
-# Last Updated: 2024-07-24
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.9+ installation.
 # Description: "Ingest covariate data" creates COG-backed assets for a folder of geotiffs in GEE.
 # ---------------------------------------------------------------------------
@@ -11,10 +11,13 @@
 import ee
 import json
 import os
-import re
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
-from pprint import pprint
+from requests.adapters import HTTPAdapter
 
 # Define paths
 ee_project = 'akveg-map'
@@ -22,6 +25,12 @@ storage_bucket = 'akveg-data'
 storage_prefix = 's2_sr_2019_2023_median_v20240724'
 collection = 's2_sr_2019_2023_median_midsummer_v20240724'
 
+# Define the request url
+url = 'https://earthengine.googleapis.com/v1alpha/projects/{}/assets?assetId={}'
+
+# Define number of threads for ingestion requests
+max_workers = 20
+
 # Authenticate with Earth Engine
 print('Requesting information from server...')
 ee.Authenticate()
@@ -32,52 +41,94 @@ session = AuthorizedSession(
   ee.data.get_persistent_credentials().with_quota_project(ee_project)
 )
 
-# Request list of storage objects
-client = storage.Client()
-file_list = []
-for blob in client.list_blobs(storage_bucket, prefix=storage_prefix):
-  file_list.append(blob.name)
+# Share pooled connections across threads
+# Throttled create requests are retried in post_with_backoff because urllib3 does not retry POST requests
+session.mount('https://', HTTPAdapter(pool_connections=max_workers,
+                                      pool_maxsize=max_workers))
 
-# Filter the list to geotiffs in the
-reg = re.compile(r'^' + storage_prefix + r'/.*.tif$')
-geotiff_list = list(filter(reg.search, file_list))
+# Request list of geotiff names in the storage folder, filtered on the server
+client = storage.Client()
+geotiff_list = [blob.name for blob in client.list_blobs(storage_bucket,
+                                                        prefix=storage_prefix,
+                                                        match_glob=f'{storage_prefix}/**.tif',
+                                                        fields='items(name),nextPageToken')]
 
-# Create empty image collection
-ee.data.createAsset({'type': 'ImageCollection'},
-                    f'projects/{ee_project}/assets/{collection}')
+# Get set of assets already in the image collection, or create an empty image collection if it does not exist
+collection_path = f'projects/{ee_project}/assets/{collection}'
+asset_set = set()
+# getInfo returns None only when the asset is not found and raises all other errors
+if ee.data.getInfo(collection_path) is None:
+  ee.data.createAsset({'type': 'ImageCollection'}, collection_path)
+else:
+  for asset in ee.data.listAssets({'parent': collection_path, 'view': 'BASIC'})['assets']:
+    asset_set.add(os.path.split(asset['name'])[1])
 
-# Ingest each geotiff in the storage folder
+# Skip geotiffs that have already been ingested so that interrupted runs resume
+ingest_list = []
 for geotiff in geotiff_list:
+  asset_name = os.path.splitext(os.path.split(geotiff)[1])[0].replace('.tif', '_')
+  if asset_name not in asset_set:
+    ingest_list.append(geotiff)
+print(f'{len(geotiff_list) - len(ingest_list)} of {len(geotiff_list)} geotiffs have already been ingested as COG-backed assets.')
+
+# Define function to post a request and retry it when the server reports throttling
+def post_with_backoff(request_url, request_data, attempts=5, base=0.5, cap=30.0):
+  """Post a request and retry it with truncated exponential backoff and full jitter.
+
+  Retries are only made for 429 responses and for 503 responses with a Retry-After
+  header, which the server returns without processing the request, so a repeated
+  create cannot be duplicated. A Retry-After delay in seconds is used when given.
+  """
+  for attempt in range(attempts):
+    response = session.post(url=request_url, data=request_data)
+    retry_after = response.headers.get('Retry-After')
+    throttled = response.status_code == 429 or (response.status_code == 503 and retry_after is not None)
+    if throttled == 0 or attempt == attempts - 1:
+      return response
+    if retry_after is not None and retry_after.isdigit():
+      time.sleep(min(cap, float(retry_after)))
+    else:
+      time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+# Define function to ingest a single geotiff as a COG-backed asset
+def ingest(geotiff):
   # Define file name
   file_name = os.path.split(geotiff)[1]
   asset_name = os.path.splitext(file_name)[0].replace('.tif', '_')
 
-  # Ingest asset if it does not already exist
-  print(f'Ingesting {file_name} as a COG-backed asset...')
-
   # Request body as a dictionary.
   request = {
-      'type': 'IMAGE',
-      'gcs_location': {
-          'uris': [f'gs://{storage_bucket}/{storage_prefix}/{file_name}']
-      },
-        'properties': {
-          'source': 'https://github.com/accs-uaa/akveg-map'
-        },
-        'startTime': '2024-01-01T00:00:00.000000000Z',
-        'endTime': '2024-12-31T15:01:23.000000000Z',
-      }
-  print(json.dumps(request))
+    'type': 'IMAGE',
+    'gcs_location': {
+      'uris': [f'gs://{storage_bucket}/{storage_prefix}/{file_name}']
+    },
+    'properties': {
+      'source': 'https://github.com/accs-uaa/akveg-map'
+    },
+    'startTime': '2024-01-01T00:00:00.000000000Z',
+    'endTime': '2024-12-31T15:01:23.000000000Z',
+  }
 
   # Specify a folder (or ImageCollection) name and the new asset name.
   asset_id = f'{collection}/{asset_name}'
 
-  # Define the request url
-  url = 'https://earthengine.googleapis.com/v1alpha/projects/{}/assets?assetId={}'
-
   # Post the request
-  response = session.post(
-      url=url.format(ee_project, asset_id),
-      data=json.dumps(request)
-  )
-  print(json.loads(response.content))
+  response = post_with_backoff(url.format(ee_project, asset_id), json.dumps(request))
+  response.raise_for_status()
+  return file_name
+
+# Ingest each geotiff in the storage folder in parallel threads
+print(f'Ingesting {len(ingest_list)} geotiffs as COG-backed assets...')
+failed_list = []
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+  futures = {executor.submit(ingest, geotiff): geotiff for geotiff in ingest_list}
+  for future in as_completed(futures):
+    try:
+      future.result()
+    except Exception as e:
+      failed_list.append((os.path.split(futures[future])[1], e))
+
+# Report a summary of the ingestion
+print(f'Ingested {len(ingest_list) - len(failed_list)} of {len(ingest_list)} geotiffs as COG-backed assets.')
+for file_name, error in failed_list:
+  print(f'\tFailed to ingest {file_name}:', error)
@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Ingest covariate data
 # Author: Timm Nawrocki
-# Last Updated: 2024-07-11
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.9+ installation.
 # Description: "Ingest covariate data" creates COG-backed assets for a folder of geotiffs in GEE.
 # ---------------------------------------------------------------------------
@@ -12,7 +12,13 @@ import ee
 import json
 import os
 import re
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.cloud import storage
 from pprint import pprint
 
@@ -21,64 +27,204 @@ ee_project = 'akveg-map'
 storage_bucket = 'akveg-data'
 storage_prefix = 'covariates_v20240711'
 
-# Authenticate with Earth Engine
+# Define request urls (50 sub-requests per batch)
+url = 'https://earthengine.googleapis.com/v1alpha/projects/{}/assets?assetId={}'
+batch_url = 'https://earthengine.googleapis.com/batch'
+batch_size = 50
+
+# Define number of threads for individual requests
+max_workers = 20
+
+# Authenticate with Earth Engine using stored Earth Engine credentials or application default credentials
 print('Requesting information from server...')
-ee.Authenticate()
-ee.Initialize(project=ee_project)
+try:
+  credentials = ee.data.get_persistent_credentials()
+except ee.EEException:
+  # Only start the browser authentication flow in an interactive session
+  if sys.stdin.isatty() == 0:
+    raise
+  ee.Authenticate()
+  credentials = ee.data.get_persistent_credentials()
+ee.Initialize(credentials=credentials, project=ee_project)
 
 # Specify the cloud project you want associated with Earth Engine requests.
 session = AuthorizedSession(
-  ee.data.get_persistent_credentials().with_quota_project(ee_project)
+  credentials.with_quota_project(ee_project)
 )
 
-# Request list of storage objects
-client = storage.Client()
-file_list = []
-for blob in client.list_blobs(storage_bucket, prefix=storage_prefix):
-  file_list.append(blob.name)
-
-# Filter the list to geotiffs in the
-reg = re.compile(r'^' + storage_prefix + r'/.*.tif$')
-geotiff_list = list(filter(reg.search, file_list))
-
-# Get list of GEE assets
-asset_list = []
-for asset in ee.data.listAssets(f'projects/{ee_project}/assets/{storage_prefix}')['assets']:
-  asset_list.append(os.path.split(asset['name'])[1] + '.tif')
-
-# Ingest each geotiff in the storage folder
-for geotiff in geotiff_list:
-  # Define file name
-  file_name = os.path.split(geotiff)[1]
-  # Ingest asset if it does not already exist
-  if file_name not in asset_list:
-      print(f'Ingesting {file_name} as a COG-backed asset...')
-
-      # Request body as a dictionary.
-      request = {
-        'type': 'IMAGE',
-        'gcs_location': {
-          'uris': [f'gs://{storage_bucket}/{storage_prefix}/{file_name}']
-        },
-        'properties': {
-          'source': 'https://github.com/accs-uaa/akveg-map'
-        },
-        'startTime': '2024-01-01T00:00:00.000000000Z',
-        'endTime': '2024-12-31T15:01:23.000000000Z',
-      }
-      pprint(json.dumps(request))
-
-      # Specify a folder (or ImageCollection) name and the new asset name.
-      asset_id = f'{storage_prefix}/{os.path.splitext(file_name)[0]}'
-
-      # Define the request url
-      url = 'https://earthengine.googleapis.com/v1alpha/projects/{}/assets?assetId={}'
-
-      # Post the request
-      response = session.post(
-        url=url.format(ee_project, asset_id),
-        data=json.dumps(request)
-      )
-      pprint(json.loads(response.content))
-  else:
-    print(f'{file_name} has already been ingested as a COG-backed asset.')
+# Reuse pooled connections for all requests in the session and retry throttled idempotent requests
+# POST requests are not retried automatically because a repeated create can fail as a duplicate
+session.mount('https://', HTTPAdapter(pool_connections=32,
+                                      pool_maxsize=32,
+                                      max_retries=Retry(total=5,
+                                                        backoff_factor=0.5,
+                                                        status_forcelist=[429, 500, 502, 503, 504])))
+
+# Define function to create a chunk of assets in a single batch request
+def batch_create(session, request_chunk):
+  """Create a chunk of COG-backed assets with one multipart batch request.
+
+  Each (asset_id, request) pair is sent as a POST sub-request. Returns the pairs
+  that were not confirmed as created; if the batch endpoint does not return a
+  multipart response, all pairs in the chunk are returned so that they can be
+  posted individually.
+  """
+  boundary = f'batch_{uuid.uuid4().hex}'
+  parts = []
+  for index, (asset_id, request) in enumerate(request_chunk):
+    parts.append(f'--{boundary}\r\n'
+                 f'Content-Type: application/http\r\n'
+                 f'Content-ID: <item{index}>\r\n'
+                 f'\r\n'
+                 f'POST /v1alpha/projects/{ee_project}/assets?assetId={asset_id} HTTP/1.1\r\n'
+                 f'Content-Type: application/json\r\n'
+                 f'\r\n'
+                 f'{json.dumps(request)}\r\n')
+  body = ''.join(parts) + f'--{boundary}--\r\n'
+  try:
+    response = session.post(batch_url,
+                            headers={'Content-Type': f'multipart/mixed; boundary={boundary}'},
+                            data=body)
+  except Exception as e:
+    print('Batch request failed:', e)
+    return list(request_chunk)
+  # Parse the multipart response
+  match = re.search(r'boundary=(.+)', response.headers.get('Content-Type', ''))
+  if response.status_code != 200 or match is None:
+    return list(request_chunk)
+  response_boundary = match.group(1).strip('"')
+  failed = []
+  returned = set()
+  for part in response.text.split(f'--{response_boundary}'):
+    index_match = re.search(r'Content-ID:\s*<response-item(\d+)>', part)
+    status_match = re.search(r'HTTP/1\.1 (\d{3})', part)
+    if index_match is None or status_match is None:
+      continue
+    index = int(index_match.group(1))
+    returned.add(index)
+    if int(status_match.group(1)) >= 300:
+      failed.append(request_chunk[index])
+  # Treat any sub-request missing from the response as failed
+  for index, request_pair in enumerate(request_chunk):
+    if index not in returned:
+      failed.append(request_pair)
+  return failed
+
+# Define function to list geotiff names in the storage folder
+def list_storage_geotiffs():
+  # Request list of storage object names, filtered to geotiffs on the server
+  client = storage.Client()
+  geotiff_list = []
+  for blob in client.list_blobs(storage_bucket,
+                                prefix=storage_prefix,
+                                match_glob=f'{storage_prefix}/**.tif',
+                                fields='items(name),nextPageToken'):
+    # Keep the file name of each geotiff in the storage folder
+    name = blob.name
+    if name.endswith('.tif'):
+      geotiff_list.append(name.rpartition('/')[2])
+  return geotiff_list
+
+# Define generator to return pages of GEE assets from a folder or collection
+def iter_asset_pages(parent, page_size=1000):
+  params = {'parent': parent, 'pageSize': page_size, 'view': 'BASIC'}
+  while True:
+    response = ee.data.listAssets(params)
+    yield response.get('assets', [])
+    if not response.get('nextPageToken'):
+      break
+    params['pageToken'] = response['nextPageToken']
+
+# Define function to list ingested GEE assets
+def list_gee_assets():
+  asset_list = []
+  for page in iter_asset_pages(f'projects/{ee_project}/assets/{storage_prefix}'):
+    for asset in page:
+      asset_list.append(os.path.split(asset['name'])[1] + '.tif')
+  return asset_list
+
+# Request storage objects and GEE assets concurrently
+with ThreadPoolExecutor(max_workers=2) as executor:
+  geotiff_future = executor.submit(list_storage_geotiffs)
+  asset_future = executor.submit(list_gee_assets)
+  geotiff_list = geotiff_future.result()
+  asset_list = asset_future.result()
+
+# Identify geotiffs that have not already been ingested
+geotiff_names = set(geotiff_list)
+asset_names = set(asset_list)
+missing_list = sorted(geotiff_names - asset_names)
+print(f'{len(geotiff_names) - len(missing_list)} of {len(geotiff_names)} geotiffs have already been ingested as COG-backed assets.')
+
+# Prepare an ingestion request for each missing geotiff in the storage folder
+request_list = []
+for file_name in missing_list:
+  # Request body as a dictionary.
+  request = {
+    'type': 'IMAGE',
+    'gcs_location': {
+      'uris': [f'gs://{storage_bucket}/{storage_prefix}/{file_name}']
+    },
+    'properties': {
+      'source': 'https://github.com/accs-uaa/akveg-map'
+    },
+    'startTime': '2024-01-01T00:00:00.000000000Z',
+    'endTime': '2024-12-31T15:01:23.000000000Z',
+  }
+
+  # Specify a folder (or ImageCollection) name and the new asset name.
+  asset_id = f'{storage_prefix}/{file_name.rpartition(".")[0]}'
+  request_list.append((asset_id, request))
+
+# Ingest geotiffs in batches
+failed_list = []
+for i in range(0, len(request_list), batch_size):
+  request_chunk = request_list[i:i + batch_size]
+  print(f'Ingesting {len(request_chunk)} geotiffs as COG-backed assets...')
+  failed_chunk = batch_create(session, request_chunk)
+  for asset_id, request in request_chunk:
+    if (asset_id, request) not in failed_chunk:
+      print(f'\tCreated {asset_id}.')
+  failed_list.extend(failed_chunk)
+
+# Define function to post a single ingestion request
+def post_request(asset_id, request):
+  response = session.post(
+    url=url.format(ee_project, asset_id),
+    data=json.dumps(request)
+  )
+  # Raise an error for unsuccessful requests so that they are counted as failures
+  response.raise_for_status()
+  return json.loads(response.content)
+
+# Post any requests that were not created in a batch individually in parallel threads
+# Keep at most twice the number of workers in flight so large backlogs are not queued at once
+count = 1
+error_count = 0
+pending_list = iter(failed_list)
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+  futures = {}
+  while True:
+    # Submit requests until the in-flight limit is reached
+    for asset_id, request in pending_list:
+      futures[executor.submit(post_request, asset_id, request)] = asset_id
+      if len(futures) >= 2 * max_workers:
+        break
+    if len(futures) == 0:
+      break
+    # Report the first request to complete
+    future = next(as_completed(futures))
+    asset_id = futures.pop(future)
+    try:
+      result = future.result()
+      print(f'Posted {asset_id} as a COG-backed asset ({count} of {len(failed_list)}).')
+      pprint(result)
+    except Exception as e:
+      print(f'Failed to post {asset_id} ({count} of {len(failed_list)}):', e)
+      error_count += 1
+    count += 1
+
+# Report a summary of the ingestion
+print(f'Ingested {len(request_list) - error_count} of {len(request_list)} geotiffs as COG-backed assets.')
+if error_count > 0:
+  print(f'{error_count} geotiffs failed to ingest; re-run the script to retry them.')